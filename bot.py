@@ -5,11 +5,13 @@ PropMarket Whales Bot - Discord bot for announcing new prediction market events.
 Monitors Polymarket and Kalshi for new events and posts them to a Discord webhook.
 """
 
+import asyncio
 import logging
 import signal
 import sys
 import time
-from datetime import datetime
+
+import httpx
 
 from src.api_clients import KalshiClient, PolymarketClient
 from src.config import Config
@@ -23,47 +25,63 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[logging.StreamHandler(sys.stdout)],
 )
+# httpx logs every request at INFO level
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Upper bound for the poll interval while backing off during quiet periods
+MAX_POLL_INTERVAL_SECONDS = 1800
+CLEANUP_INTERVAL_SECONDS = 86400
+# How often a RAM-backed database (FAST_STORAGE) is snapshotted to disk
+SNAPSHOT_INTERVAL_SECONDS = 300
+
 
 class MarketEventsBot:
     """Main bot class that orchestrates market monitoring and Discord posting."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        api_client: httpx.AsyncClient,
+        discord_client: httpx.AsyncClient,
+    ):
         self.config = config
-        self.storage = MarketStorage(config.database_path)
-        self.discord = DiscordWebhook(config)
+        self.storage = MarketStorage(config.database_path, fast_mode=config.fast_storage)
+        self.discord = DiscordWebhook(config, discord_client)
         self.polymarket = PolymarketClient(
+            api_client,
             config.polymarket_api_url,
             min_hours_to_expiration=config.min_hours_to_expiration
         )
         self.kalshi = KalshiClient(
+            api_client,
             config.kalshi_api_url,
             min_hours_to_expiration=config.min_hours_to_expiration
         )
         self._running = False
+        self._stop_event = asyncio.Event()
+        self._consecutive_empty = 0
+        self._last_cleanup = time.monotonic()
+        self._last_snapshot = time.monotonic()
 
-    def _fetch_all_events(self) -> list[MarketEvent]:
-        """Fetch events from all sources."""
+    async def _fetch_all_events(self) -> list[MarketEvent]:
+        """Fetch events from all sources concurrently."""
         all_events = []
 
-        # Fetch from Polymarket
-        try:
-            polymarket_events = self.polymarket.fetch_events()
-            all_events.extend(polymarket_events)
-        except Exception as e:
-            logger.error(f"Error fetching Polymarket events: {e}")
-
-        # Fetch from Kalshi
-        try:
-            kalshi_events = self.kalshi.fetch_events()
-            all_events.extend(kalshi_events)
-        except Exception as e:
-            logger.error(f"Error fetching Kalshi events: {e}")
+        results = await asyncio.gather(
+            self.polymarket.fetch_events(),
+            self.kalshi.fetch_events(),
+            return_exceptions=True,
+        )
+        for source_name, result in zip(("Polymarket", "Kalshi"), results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error fetching {source_name} events: {result}")
+            else:
+                all_events.extend(result)
 
         return all_events
 
-    def _process_events(self, events: list[MarketEvent]) -> int:
+    async def _process_events(self, events: list[MarketEvent]) -> int:
         """Process events: filter new ones and post to Discord. Returns count posted."""
         new_events = self.storage.get_new_events(events)
 
@@ -74,21 +92,20 @@ class MarketEventsBot:
         logger.info(f"Found {len(new_events)} new events")
 
         # Post to Discord grouped by category
-        posted_events = self.discord.post_grouped_events(new_events)
-        for event in posted_events:
-            self.storage.mark_seen(event)
+        posted_events = await self.discord.post_grouped_events(new_events)
+        await self.storage.mark_many_seen_async(posted_events)
 
         logger.info(f"Posted {len(posted_events)}/{len(new_events)} events to Discord")
         return len(posted_events)
 
-    def run_once(self) -> int:
+    async def run_once(self) -> int:
         """Run a single poll cycle. Returns number of events posted."""
         logger.info("Starting poll cycle...")
-        events = self._fetch_all_events()
+        events = await self._fetch_all_events()
         logger.info(f"Fetched {len(events)} total events from all sources")
-        return self._process_events(events)
+        return await self._process_events(events)
 
-    def run(self):
+    async def run(self):
         """Run the bot in a continuous polling loop."""
         self._running = True
         logger.info(
@@ -96,40 +113,59 @@ class MarketEventsBot:
         )
 
         # Post startup message
-        self.discord.post_startup_message()
+        await self.discord.post_startup_message()
 
         # Initial population of database without posting
         # (so we don't spam on first run)
-        self._initial_sync()
+        await self._initial_sync()
 
         while self._running:
+            delay = self.config.poll_interval_seconds
             try:
-                self.run_once()
-
-                # Periodic cleanup (once per day worth of cycles)
-                cycles_per_day = 86400 // self.config.poll_interval_seconds
-                if hasattr(self, "_cycle_count"):
-                    self._cycle_count += 1
-                else:
-                    self._cycle_count = 1
+                posted = await self.run_once()
+                delay = self._next_poll_delay(posted)
 
-                if self._cycle_count % cycles_per_day == 0:
+                # Periodic cleanup (once per day)
+                if time.monotonic() - self._last_cleanup >= CLEANUP_INTERVAL_SECONDS:
                     self.storage.cleanup_old_entries(days=90)
+                    self._last_cleanup = time.monotonic()
+
+                if (
+                    self.storage.fast_mode
+                    and time.monotonic() - self._last_snapshot >= SNAPSHOT_INTERVAL_SECONDS
+                ):
+                    self.storage.snapshot()
+                    self._last_snapshot = time.monotonic()
 
             except Exception as e:
                 logger.error(f"Error in poll cycle: {e}", exc_info=True)
 
             if self._running:
-                logger.info(
-                    f"Sleeping for {self.config.poll_interval_seconds}s until next poll"
-                )
-                time.sleep(self.config.poll_interval_seconds)
+                logger.info(f"Sleeping for {delay:.0f}s until next poll")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _next_poll_delay(self, posted: int) -> float:
+        """Poll sooner right after new events and back off while markets are quiet."""
+        interval = self.config.poll_interval_seconds
+        if posted:
+            self._consecutive_empty = 0
+            return max(interval // 4, 1)
+
+        delay = min(
+            interval * 1.5 ** self._consecutive_empty,
+            max(interval, MAX_POLL_INTERVAL_SECONDS),
+        )
+        self._consecutive_empty += 1
+        return delay
 
-    def _initial_sync(self):
+    async def _initial_sync(self):
         """Initial sync to populate database without posting."""
         logger.info("Performing initial sync (marking existing events as seen)...")
-        events = self._fetch_all_events()
-        self.storage.mark_many_seen(events)
+        events = await self._fetch_all_events()
+        await self.storage.mark_many_seen_async(events)
         stats = self.storage.get_stats()
         logger.info(f"Initial sync complete. Stats: {stats}")
 
@@ -137,6 +173,41 @@ class MarketEventsBot:
         """Signal the bot to stop."""
         logger.info("Stopping bot...")
         self._running = False
+        self._stop_event.set()
+
+
+async def run_bot(config: Config):
+    """Run the bot with HTTP clients shared for its whole lifetime."""
+    # The market APIs are polled over HTTP/2 so concurrent page requests
+    # multiplex over one connection; Discord webhooks stay on HTTP/1.1.
+    # httpx does not follow redirects by default, unlike requests and aiohttp
+    api_limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=75)
+    async with (
+        httpx.AsyncClient(http2=True, limits=api_limits, follow_redirects=True) as api_client,
+        httpx.AsyncClient() as discord_client,
+    ):
+        bot = MarketEventsBot(config, api_client, discord_client)
+
+        # Handle graceful shutdown; the handlers run on the event loop so they
+        # can wake the bot from its sleep between polls
+        def signal_handler(signum):
+            logger.info(f"Received signal {signum}")
+            bot.stop()
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, signal_handler, signum)
+            except NotImplementedError:
+                # Windows event loops don't support signal handlers
+                signal.signal(
+                    signum, lambda s, frame: loop.call_soon_threadsafe(signal_handler, s)
+                )
+
+        try:
+            await bot.run()
+        finally:
+            bot.storage.close()
 
 
 def main():
@@ -149,18 +220,7 @@ def main():
         sys.exit(1)
 
     # Create and run bot
-    bot = MarketEventsBot(config)
-
-    # Handle graceful shutdown
-    def signal_handler(signum, frame):
-        logger.info(f"Received signal {signum}")
-        bot.stop()
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
-    # Run the bot
-    bot.run()
+    asyncio.run(run_bot(config))
 
 
 if __name__ == "__main__":
@@ -1,139 +1,200 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
+import orjson
 
-from src.models import MarketEvent, MarketSource
+from src.models import MAX_TITLE_LENGTH, MarketEvent, MarketSource
 
 logger = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT = httpx.Timeout(30.0)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Longest Retry-After waited out inside a poll; longer ones fail the source for this cycle
+MAX_RETRY_AFTER_SECONDS = 60
 
-def create_session_with_retries(retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
-    """Create a requests session with retry logic."""
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds the server asks us to wait via Retry-After (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class Page:
+    """A parsed page of API results, kept for conditional re-fetching."""
+
+    events: list[MarketEvent]
+    size: int  # Number of raw items on the page, before parsing and filtering
+    cursor: str | None = None
+    etag: str | None = None
 
 
 class MarketAPIClient(ABC):
     """Abstract base class for market API clients."""
 
-    def __init__(self, min_hours_to_expiration: int = 24):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        min_hours_to_expiration: int = 24,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.client = client
         self.min_hours_to_expiration = min_hours_to_expiration
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._page_cache: dict = {}
 
     @abstractmethod
-    def fetch_events(self) -> list[MarketEvent]:
+    async def fetch_events(self) -> list[MarketEvent]:
         """Fetch all current events from the API."""
         pass
 
-    def _passes_expiration_filter(self, end_date: datetime | None) -> bool:
-        """Check if an event passes the minimum expiration filter."""
-        if end_date is None:
-            # If no end date, include it (be permissive)
-            return True
-
-        now = datetime.now(timezone.utc)
-        min_end_date = now + timedelta(hours=self.min_hours_to_expiration)
-        return end_date >= min_end_date
-
-
-class PolymarketClient(MarketAPIClient):
-    """Client for the Polymarket API."""
-
-    def __init__(self, api_url: str = "https://gamma-api.polymarket.com/events", min_hours_to_expiration: int = 24):
-        super().__init__(min_hours_to_expiration)
-        self.api_url = api_url
-        self.session = create_session_with_retries()
-
-    def fetch_events(self) -> list[MarketEvent]:
-        """Fetch active events from Polymarket."""
-        events = []
-        offset = 0
-        limit = 100
+    @abstractmethod
+    def _parse_page(self, data: Any, etag: str | None) -> Page:
+        """Parse a raw API response into a page of events."""
+        pass
 
-        try:
-            while True:
-                response = self.session.get(
-                    self.api_url,
-                    params={
-                        "active": "true",
-                        "limit": limit,
-                        "offset": offset,
-                    },
-                    timeout=30,
+    async def _get_json(self, url: str, params: dict, etag: str | None = None) -> tuple[Any, str | None]:
+        """GET a JSON document, retrying transient failures with exponential backoff.
+
+        A Retry-After header on a retried response lengthens the wait to what
+        the server asked for, up to MAX_RETRY_AFTER_SECONDS; a longer one is
+        raised as the response's HTTP error instead.
+
+        Returns the parsed document and its ETag. When ``etag`` is given and the
+        server reports the document unchanged, the document is None.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        for attempt in range(self.retries + 1):
+            delay = self.backoff_factor * (2 ** attempt)
+            try:
+                response = await self.client.get(
+                    url, params=params, headers=headers, timeout=REQUEST_TIMEOUT
                 )
-                response.raise_for_status()
-                data = response.json()
-
-                if not data:
-                    break
+                if response.status_code == 304:
+                    return None, etag
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    response.raise_for_status()
+                    try:
+                        data = orjson.loads(response.content)
+                    except orjson.JSONDecodeError as e:
+                        # Surface as an HTTP error so callers keep the pages already fetched
+                        raise httpx.DecodingError(
+                            f"Invalid JSON from {url}: {e}", request=response.request
+                        ) from e
+                    return data, response.headers.get("ETag")
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    if retry_after > MAX_RETRY_AFTER_SECONDS:
+                        # Waiting would stall the poll and block shutdown until then
+                        logger.warning(f"{url} asked to retry after {retry_after:.0f}s, giving up")
+                        response.raise_for_status()
+                    delay = max(delay, retry_after)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _fetch_page(self, key, params: dict, page_cache: dict) -> Page:
+        """Fetch and parse one page, reusing the last parse if the server reports it unchanged."""
+        previous = self._page_cache.get(key)
+        data, etag = await self._get_json(
+            self.api_url, params=params, etag=previous.etag if previous else None
+        )
+
+        if data is None:
+            # Events may have crossed the expiration cutoff since they were parsed
+            min_end_date = self._expiration_cutoff()
+            page = replace(
+                previous,
+                events=[
+                    e for e in previous.events
+                    if e.end_date is None or e.end_date >= min_end_date
+                ],
+            )
+        else:
+            page = self._parse_page(data, etag)
 
-                for item in data:
-                    event = self._parse_event(item)
-                    if event:
-                        events.append(event)
+        if page.etag:
+            page_cache[key] = page
+        return page
 
-                if len(data) < limit:
-                    break
+    def _expiration_cutoff(self) -> datetime:
+        """Earliest end date an event may have to pass the minimum expiration filter."""
+        return datetime.now(timezone.utc) + timedelta(hours=self.min_hours_to_expiration)
 
-                offset += limit
 
-            logger.info(f"Fetched {len(events)} events from Polymarket")
+def _make_polymarket_parser():
+    """Build a Polymarket event parser with its constants bound as closure locals.
 
-        except requests.RequestException as e:
-            logger.error(f"Error fetching from Polymarket: {e}")
+    The parser runs once per event on every poll, so the model class, source
+    and URL prefix are looked up once here instead of as globals per call.
+    """
+    event_cls = MarketEvent
+    source = MarketSource.POLYMARKET
+    base_url = "https://polymarket.com/event/"
+    fromisoformat = datetime.fromisoformat
+    max_title = MAX_TITLE_LENGTH
 
-        return events
-
-    def _parse_event(self, data: dict) -> MarketEvent | None:
+    def parse_event(data: dict, min_end_date: datetime) -> MarketEvent | None:
         """Parse a Polymarket event into our unified model."""
         try:
-            event_id = data.get("id")
+            get = data.get
+            event_id = get("id")
             if not event_id:
                 return None
 
             # Build the URL from slug
-            slug = data.get("slug", "")
-            url = f"https://polymarket.com/event/{slug}" if slug else ""
+            slug = get("slug", "")
+            url = base_url + slug if slug else ""
 
             # Parse creation date
             created_at = None
-            if creation_date := data.get("creationDate"):
+            if creation_date := get("creationDate"):
                 try:
-                    created_at = datetime.fromisoformat(creation_date.replace("Z", "+00:00"))
+                    created_at = fromisoformat(creation_date)
                 except (ValueError, TypeError):
                     pass
 
             # Parse end date
             end_date = None
-            if end_date_str := data.get("endDate"):
+            if end_date_str := get("endDate"):
                 try:
-                    end_date = datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
+                    end_date = fromisoformat(end_date_str)
                 except (ValueError, TypeError):
                     pass
 
-            # Filter by expiration
-            if not self._passes_expiration_filter(end_date):
+            # Filter by expiration (events without an end date are kept)
+            if end_date is not None and end_date < min_end_date:
                 return None
 
-            return MarketEvent(
+            description = get("description", "")
+            return event_cls(
                 id=str(event_id),
-                source=MarketSource.POLYMARKET,
-                title=data.get("title", "Unknown"),
-                description=data.get("description", "")[:500],  # Truncate long descriptions
+                source=source,
+                title=(get("title") or "Unknown")[:max_title],
+                description=description[:500],  # Truncate long descriptions
                 url=url,
-                category=data.get("category", "Unknown"),
+                category=get("category", "Unknown"),
                 created_at=created_at,
                 end_date=end_date,
             )
@@ -141,92 +202,187 @@ class PolymarketClient(MarketAPIClient):
             logger.warning(f"Failed to parse Polymarket event: {e}")
             return None
 
+    return parse_event
 
-class KalshiClient(MarketAPIClient):
-    """Client for the Kalshi API."""
-
-    def __init__(self, api_url: str = "https://api.elections.kalshi.com/trade-api/v2/events", min_hours_to_expiration: int = 24):
-        super().__init__(min_hours_to_expiration)
-        self.api_url = api_url
-        self.session = create_session_with_retries()
-
-    def fetch_events(self) -> list[MarketEvent]:
-        """Fetch events from Kalshi."""
-        events = []
-        cursor = None
-
-        try:
-            while True:
-                params = {"limit": 100}
-                if cursor:
-                    params["cursor"] = cursor
-
-                response = self.session.get(
-                    self.api_url,
-                    params=params,
-                    timeout=30,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                event_list = data.get("events", [])
-                for item in event_list:
-                    event = self._parse_event(item)
-                    if event:
-                        events.append(event)
-
-                # Handle pagination
-                cursor = data.get("cursor")
-                if not cursor or not event_list:
-                    break
-
-            logger.info(f"Fetched {len(events)} events from Kalshi")
-
-        except requests.RequestException as e:
-            logger.error(f"Error fetching from Kalshi: {e}")
 
-        return events
+def _make_kalshi_parser():
+    """Build a Kalshi event parser with its constants bound as closure locals."""
+    event_cls = MarketEvent
+    source = MarketSource.KALSHI
+    base_url = "https://kalshi.com/markets/"
+    fromisoformat = datetime.fromisoformat
+    max_title = MAX_TITLE_LENGTH
+    # Kalshi uses strike_date or expiration_time
+    date_fields = ("strike_date", "expiration_time", "close_time")
 
-    def _parse_event(self, data: dict) -> MarketEvent | None:
+    def parse_event(data: dict, min_end_date: datetime) -> MarketEvent | None:
         """Parse a Kalshi event into our unified model."""
         try:
-            event_ticker = data.get("event_ticker")
+            get = data.get
+            event_ticker = get("event_ticker")
             if not event_ticker:
                 return None
 
-            # Build URL from event ticker
-            url = f"https://kalshi.com/markets/{event_ticker}"
-
             # Combine title and subtitle
-            title = data.get("title", "Unknown")
-            subtitle = data.get("sub_title", "")
+            title = get("title") or "Unknown"
+            subtitle = get("sub_title", "")
             if subtitle:
                 title = f"{title} - {subtitle}"
 
-            # Parse end date (Kalshi uses strike_date or expiration_time)
+            # Parse end date
             end_date = None
-            for date_field in ["strike_date", "expiration_time", "close_time"]:
-                if date_str := data.get(date_field):
+            for date_field in date_fields:
+                if date_str := get(date_field):
                     try:
-                        end_date = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+                        end_date = fromisoformat(date_str)
                         break
                     except (ValueError, TypeError):
                         continue
 
-            # Filter by expiration
-            if not self._passes_expiration_filter(end_date):
+            # Filter by expiration (events without an end date are kept)
+            if end_date is not None and end_date < min_end_date:
                 return None
 
-            return MarketEvent(
+            return event_cls(
                 id=event_ticker,
-                source=MarketSource.KALSHI,
-                title=title,
+                source=source,
+                title=title[:max_title],
                 description="",  # Kalshi doesn't provide description in list endpoint
-                url=url,
-                category=data.get("category", "Unknown"),
+                url=base_url + event_ticker,
+                category=get("category", "Unknown"),
                 created_at=None,  # Not provided in the response
                 end_date=end_date,
             )
         except Exception as e:
             logger.warning(f"Failed to parse Kalshi event: {e}")
             return None
+
+    return parse_event
+
+
+class PolymarketClient(MarketAPIClient):
+    """Client for the Polymarket API."""
+
+    # Pages requested concurrently per round; bounds over-fetch past the last page
+    PAGES_PER_ROUND = 4
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        api_url: str = "https://gamma-api.polymarket.com/events",
+        min_hours_to_expiration: int = 24,
+    ):
+        super().__init__(client, min_hours_to_expiration)
+        self.api_url = api_url
+        self._parse_event = _make_polymarket_parser()
+
+    async def fetch_events(self) -> list[MarketEvent]:
+        """Fetch active events from Polymarket."""
+        events = []
+        offset = 0
+        limit = 100
+        page_cache: dict[int, Page] = {}
+
+        try:
+            while True:
+                # The API accepts arbitrary offsets, so speculatively request the
+                # next few pages at once and stop at the first short one
+                tasks = [
+                    asyncio.create_task(self._fetch_page(
+                        page_offset,
+                        params={
+                            "active": "true",
+                            "limit": limit,
+                            "offset": page_offset,
+                        },
+                        page_cache=page_cache,
+                    ))
+                    for page_offset in range(offset, offset + self.PAGES_PER_ROUND * limit, limit)
+                ]
+                try:
+                    pages = await asyncio.gather(*tasks)
+                except BaseException:
+                    # Stop the rest of the round and collect their outcomes so
+                    # none is left running or reported as never retrieved
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+
+                last_page = False
+                for page in pages:
+                    events.extend(page.events)
+
+                    if page.size < limit:
+                        last_page = True
+                        break
+
+                if last_page:
+                    break
+
+                offset += self.PAGES_PER_ROUND * limit
+
+            logger.info(f"Fetched {len(events)} events from Polymarket")
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching from Polymarket: {e}")
+
+        self._page_cache = page_cache
+        return events
+
+    def _parse_page(self, data: list, etag: str | None) -> Page:
+        """Parse a page of Polymarket events."""
+        parse_event = self._parse_event
+        min_end_date = self._expiration_cutoff()
+        events = [event for item in data if (event := parse_event(item, min_end_date))]
+        return Page(events=events, size=len(data), etag=etag)
+
+
+class KalshiClient(MarketAPIClient):
+    """Client for the Kalshi API."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        api_url: str = "https://api.elections.kalshi.com/trade-api/v2/events",
+        min_hours_to_expiration: int = 24,
+    ):
+        super().__init__(client, min_hours_to_expiration)
+        self.api_url = api_url
+        self._parse_event = _make_kalshi_parser()
+
+    async def fetch_events(self) -> list[MarketEvent]:
+        """Fetch events from Kalshi."""
+        events = []
+        cursor = None
+        page_cache: dict[str | None, Page] = {}
+
+        try:
+            while True:
+                params = {"limit": 100}
+                if cursor:
+                    params["cursor"] = cursor
+
+                page = await self._fetch_page(cursor, params=params, page_cache=page_cache)
+                events.extend(page.events)
+
+                # Handle pagination
+                cursor = page.cursor
+                if not cursor or not page.size:
+                    break
+
+            logger.info(f"Fetched {len(events)} events from Kalshi")
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching from Kalshi: {e}")
+
+        self._page_cache = page_cache
+        return events
+
+    def _parse_page(self, data: dict, etag: str | None) -> Page:
+        """Parse a page of Kalshi events."""
+        event_list = data.get("events", [])
+        parse_event = self._parse_event
+        min_end_date = self._expiration_cutoff()
+        events = [event for item in event_list if (event := parse_event(item, min_end_date))]
+        return Page(events=events, size=len(event_list), cursor=data.get("cursor"), etag=etag)
@@ -9,6 +9,7 @@ class Config:
     discord_webhook_url: str
     poll_interval_seconds: int = 300  # 5 minutes default
     database_path: str = "data/seen_markets.db"
+    fast_storage: bool = False  # Keep the database in RAM, snapshotting to database_path
 
     # API endpoints
     polymarket_api_url: str = "https://gamma-api.polymarket.com/events"
@@ -36,6 +37,7 @@ class Config:
             discord_webhook_url=webhook_url,
             poll_interval_seconds=int(os.getenv("POLL_INTERVAL_SECONDS", "300")),
             database_path=os.getenv("DATABASE_PATH", "data/seen_markets.db"),
+            fast_storage=os.getenv("FAST_STORAGE", "false").lower() in ("1", "true", "yes"),
             bot_username=os.getenv("BOT_USERNAME", "Market Events"),
             bot_avatar_url=os.getenv("BOT_AVATAR_URL", "https://i.imgur.com/AfFp7pu.png"),
             min_hours_to_expiration=int(os.getenv("MIN_HOURS_TO_EXPIRATION", "24")),
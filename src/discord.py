@@ -1,14 +1,20 @@
+import asyncio
 import logging
 import time
 from collections import defaultdict
 
-import requests
+import httpx
+import orjson
 
 from src.config import Config
-from src.models import MarketEvent, MarketSource
+from src.models import DISPLAY_NAMES, MAX_TITLE_LENGTH, MarketEvent, MarketSource
 
 logger = logging.getLogger(__name__)
 
+POST_TIMEOUT = httpx.Timeout(10.0)
+JSON_HEADERS = {"Content-Type": "application/json"}
+DEFAULT_COLOR = 0x5865F2  # Discord blurple
+
 
 class DiscordWebhook:
     """Discord webhook client for posting market events."""
@@ -16,40 +22,48 @@ class DiscordWebhook:
     # Discord rate limits: 30 requests per 60 seconds per webhook
     RATE_LIMIT_DELAY = 2.0  # seconds between posts to be safe
 
-    def __init__(self, config: Config):
+    # Attempts per message when Discord keeps answering 429
+    MAX_POST_ATTEMPTS = 5
+
+    # Discord limits per webhook message
+    MAX_EMBEDS_PER_MESSAGE = 10
+    MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+    def __init__(self, config: Config, client: httpx.AsyncClient):
         self.config = config
-        self.session = requests.Session()
+        self.client = client
         self._last_post_time = 0.0
 
-    def _get_embed_color(self, source: MarketSource) -> int:
-        """Get the embed color for a market source."""
-        if source == MarketSource.POLYMARKET:
-            return self.config.polymarket_color
-        elif source == MarketSource.KALSHI:
-            return self.config.kalshi_color
-        return 0x5865F2  # Discord blurple default
-
-    def _get_source_icon(self, source: MarketSource) -> str:
-        """Get the icon/emoji for a market source."""
-        if source == MarketSource.POLYMARKET:
-            return "🟣"
-        elif source == MarketSource.KALSHI:
-            return "🟢"
-        return "📊"
+        # Per-source embed constants: (color, icon, display name)
+        self._source_meta: dict[MarketSource, tuple[int, str, str]] = {
+            MarketSource.POLYMARKET: (
+                config.polymarket_color, "🟣", DISPLAY_NAMES[MarketSource.POLYMARKET]
+            ),
+            MarketSource.KALSHI: (config.kalshi_color, "🟢", DISPLAY_NAMES[MarketSource.KALSHI]),
+        }
+        # Fields shared by every webhook payload
+        self._payload_base = {
+            "username": config.bot_username,
+            "avatar_url": config.bot_avatar_url,
+        }
+        self._source_labels = {
+            source: f"{icon} {name}" for source, (_, icon, name) in self._source_meta.items()
+        }
 
     def _format_embed(self, event: MarketEvent) -> dict:
         """Format a market event as a Discord embed."""
-        source_icon = self._get_source_icon(event.source)
-        source_name = event.source.value.title()
+        color, _, source_name = self._source_meta[event.source]
+        # Titles are truncated to Discord's limit when parsed
+        assert len(event.title) <= MAX_TITLE_LENGTH
 
         embed = {
-            "title": event.title[:256],  # Discord limit
+            "title": event.title,
             "url": event.url if event.url else None,
-            "color": self._get_embed_color(event.source),
+            "color": color,
             "fields": [
                 {
                     "name": "Source",
-                    "value": f"{source_icon} {source_name}",
+                    "value": self._source_labels[event.source],
                     "inline": True,
                 },
                 {
@@ -69,50 +83,77 @@ class DiscordWebhook:
 
         return embed
 
-    def _respect_rate_limit(self):
+    @staticmethod
+    def _embed_length(embed: dict) -> int:
+        """Count the characters of an embed that Discord's message limit applies to."""
+        length = len(embed.get("title", "")) + len(embed.get("description", ""))
+        length += len(embed.get("footer", {}).get("text", ""))
+        for field in embed.get("fields", []):
+            length += len(field["name"]) + len(field["value"])
+        return length
+
+    async def _respect_rate_limit(self):
         """Ensure we don't exceed Discord's rate limits."""
         elapsed = time.time() - self._last_post_time
         if elapsed < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - elapsed)
+            await asyncio.sleep(self.RATE_LIMIT_DELAY - elapsed)
         self._last_post_time = time.time()
 
-    def post_event(self, event: MarketEvent) -> bool:
-        """Post a single market event to Discord."""
-        self._respect_rate_limit()
-
-        payload = {
-            "username": self.config.bot_username,
-            "avatar_url": self.config.bot_avatar_url,
-            "embeds": [self._format_embed(event)],
-        }
-
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        """Seconds to wait after a 429, from the JSON body, the Retry-After header, or 5s."""
+        try:
+            return float(orjson.loads(response.content)["retry_after"])
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            # Not Discord's JSON body, e.g. an HTML page from a proxy
+            pass
         try:
-            response = self.session.post(
+            return float(response.headers.get("Retry-After", 5))
+        except ValueError:
+            return 5.0
+
+    async def _post(self, body: bytes):
+        """POST a serialized payload to the webhook, waiting out Discord rate limits.
+
+        Raises httpx.HTTPError if the post fails or is still rate limited
+        after MAX_POST_ATTEMPTS attempts.
+        """
+        for attempt in range(self.MAX_POST_ATTEMPTS):
+            response = await self.client.post(
                 self.config.discord_webhook_url,
-                json=payload,
-                timeout=10,
+                content=body,
+                headers=JSON_HEADERS,
+                timeout=POST_TIMEOUT,
             )
+            if response.status_code != 429 or attempt == self.MAX_POST_ATTEMPTS - 1:
+                response.raise_for_status()
+                return
+            retry_after = self._retry_after(response)
 
-            if response.status_code == 429:
-                # Rate limited - wait and retry
-                retry_after = response.json().get("retry_after", 5)
-                logger.warning(f"Rate limited by Discord, waiting {retry_after}s")
-                time.sleep(retry_after)
-                return self.post_event(event)  # Retry
+            # Rate limited - wait and retry with the same body
+            logger.warning(f"Rate limited by Discord, waiting {retry_after}s")
+            await asyncio.sleep(retry_after)
 
-            response.raise_for_status()
+    async def post_event(self, event: MarketEvent) -> bool:
+        """Post a single market event to Discord."""
+        await self._respect_rate_limit()
+
+        payload = {**self._payload_base, "embeds": [self._format_embed(event)]}
+
+        try:
+            await self._post(orjson.dumps(payload))
             logger.info(f"Posted event to Discord: {event.title[:50]}...")
             return True
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to post to Discord: {e}")
             return False
 
-    def post_events(self, events: list[MarketEvent]) -> int:
+    async def post_events(self, events: list[MarketEvent]) -> int:
         """Post multiple events to Discord. Returns count of successful posts."""
         successful = 0
         for event in events:
-            if self.post_event(event):
+            if await self.post_event(event):
                 successful += 1
         return successful
 
@@ -122,9 +163,10 @@ class DiscordWebhook:
         title = f"{count} New {category} Event{'s' if count != 1 else ''}"
 
         # Build list of event links with source icons
+        source_meta = self._source_meta
         lines = []
         for event in events:
-            source_icon = self._get_source_icon(event.source)
+            source_icon = source_meta[event.source][1]
             if event.url:
                 lines.append(f"{source_icon} [{event.title}]({event.url})")
             else:
@@ -136,12 +178,12 @@ class DiscordWebhook:
             description = description[:4093] + "..."
 
         # Use the color of the first event's source
-        color = self._get_embed_color(events[0].source)
+        color = source_meta[events[0].source][0]
 
         # If mixed sources, use default blurple
         sources = {e.source for e in events}
         if len(sources) > 1:
-            color = 0x5865F2
+            color = DEFAULT_COLOR
 
         return {
             "title": title,
@@ -149,7 +191,7 @@ class DiscordWebhook:
             "color": color,
         }
 
-    def post_grouped_events(self, events: list[MarketEvent]) -> list[MarketEvent]:
+    async def post_grouped_events(self, events: list[MarketEvent]) -> list[MarketEvent]:
         """Post events grouped by category. Returns the list of successfully posted events."""
         if not events:
             return []
@@ -159,7 +201,11 @@ class DiscordWebhook:
         for event in events:
             by_category[event.category or "Unknown"].append(event)
 
-        posted_events: list[MarketEvent] = []
+        # Build one embed per category and pack them into as few messages as
+        # Discord's per-message embed limits allow
+        batches: list[list[tuple[dict, list[MarketEvent]]]] = []
+        batch: list[tuple[dict, list[MarketEvent]]] = []
+        batch_chars = 0
 
         for category, group in by_category.items():
             if len(group) == 1:
@@ -169,44 +215,43 @@ class DiscordWebhook:
                 # Multiple events - post as grouped summary
                 embed = self._format_grouped_embed(category, group)
 
-            self._respect_rate_limit()
-            payload = {
-                "username": self.config.bot_username,
-                "avatar_url": self.config.bot_avatar_url,
-                "embeds": [embed],
-            }
+            embed_chars = self._embed_length(embed)
+            if batch and (
+                len(batch) == self.MAX_EMBEDS_PER_MESSAGE
+                or batch_chars + embed_chars > self.MAX_EMBED_CHARS_PER_MESSAGE
+            ):
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
 
-            try:
-                response = self.session.post(
-                    self.config.discord_webhook_url,
-                    json=payload,
-                    timeout=10,
-                )
+            batch.append((embed, group))
+            batch_chars += embed_chars
 
-                if response.status_code == 429:
-                    retry_after = response.json().get("retry_after", 5)
-                    logger.warning(f"Rate limited by Discord, waiting {retry_after}s")
-                    time.sleep(retry_after)
-                    # Retry this group
-                    response = self.session.post(
-                        self.config.discord_webhook_url,
-                        json=payload,
-                        timeout=10,
-                    )
+        if batch:
+            batches.append(batch)
 
-                response.raise_for_status()
-                posted_events.extend(group)
-                if len(group) == 1:
-                    logger.info(f"Posted event to Discord: {group[0].title[:50]}...")
-                else:
-                    logger.info(f"Posted {len(group)} {category} events to Discord as group")
+        posted_events: list[MarketEvent] = []
 
-            except requests.RequestException as e:
-                logger.error(f"Failed to post {category} group to Discord: {e}")
+        for batch in batches:
+            batch_events = [event for _, group in batch for event in group]
+
+            await self._respect_rate_limit()
+            payload = {**self._payload_base, "embeds": [embed for embed, _ in batch]}
+            body = orjson.dumps(payload)
+
+            try:
+                await self._post(body)
+                posted_events.extend(batch_events)
+                logger.info(
+                    f"Posted {len(batch_events)} events to Discord in {len(batch)} embeds"
+                )
+
+            except httpx.HTTPError as e:
+                logger.error(f"Failed to post {len(batch_events)} events to Discord: {e}")
 
         return posted_events
 
-    def post_startup_message(self) -> bool:
+    async def post_startup_message(self) -> bool:
         """Post a startup notification to Discord."""
         # Format expiration filter
         hours = self.config.min_hours_to_expiration
@@ -216,13 +261,12 @@ class DiscordWebhook:
             expiration_str = f"{hours}+ hours"
 
         payload = {
-            "username": self.config.bot_username,
-            "avatar_url": self.config.bot_avatar_url,
+            **self._payload_base,
             "embeds": [
                 {
                     "title": "Market Events Bot Started",
                     "description": "Now monitoring Polymarket and Kalshi for new events.",
-                    "color": 0x5865F2,
+                    "color": DEFAULT_COLOR,
                     "fields": [
                         {
                             "name": "Poll Interval",
@@ -236,7 +280,7 @@ class DiscordWebhook:
                         },
                         {
                             "name": "Sources",
-                            "value": "🟣 Polymarket\n🟢 Kalshi",
+                            "value": "\n".join(self._source_labels.values()),
                             "inline": True,
                         },
                     ],
@@ -245,14 +289,9 @@ class DiscordWebhook:
         }
 
         try:
-            response = self.session.post(
-                self.config.discord_webhook_url,
-                json=payload,
-                timeout=10,
-            )
-            response.raise_for_status()
+            await self._post(orjson.dumps(payload))
             logger.info("Posted startup message to Discord")
             return True
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to post startup message: {e}")
             return False
@@ -1,14 +1,23 @@
 from dataclasses import dataclass
 from datetime import datetime
-from enum import Enum
+from enum import IntEnum
 
+# Titles are cut to Discord's embed title limit once, when events are parsed
+MAX_TITLE_LENGTH = 256
 
-class MarketSource(Enum):
-    POLYMARKET = "polymarket"
-    KALSHI = "kalshi"
 
+class MarketSource(IntEnum):
+    POLYMARKET = 1
+    KALSHI = 2
 
-@dataclass
+
+DISPLAY_NAMES = {
+    MarketSource.POLYMARKET: "Polymarket",
+    MarketSource.KALSHI: "Kalshi",
+}
+
+
+@dataclass(slots=True, frozen=True, eq=False)
 class MarketEvent:
     """Unified market event representation from any source."""
 
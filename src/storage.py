@@ -1,21 +1,194 @@
+import asyncio
+import hashlib
 import logging
 import os
+import queue
 import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
-from datetime import datetime
 
 from src.models import MarketEvent, MarketSource
 
 logger = logging.getLogger(__name__)
 
 
+def _migrate_source_to_integer(conn: sqlite3.Connection):
+    """Schema v1: store ``source`` as the integer MarketSource value instead of its name."""
+    conn.execute("ALTER TABLE seen_markets RENAME TO seen_markets_old")
+    conn.execute("""
+        CREATE TABLE seen_markets (
+            id TEXT NOT NULL,
+            source INTEGER NOT NULL,
+            title TEXT,
+            url TEXT,
+            category TEXT,
+            first_seen_at TEXT NOT NULL,
+            PRIMARY KEY (id, source)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO seen_markets (id, source, title, url, category, first_seen_at)
+        SELECT id, CASE source WHEN 'polymarket' THEN 1 WHEN 'kalshi' THEN 2 END,
+               title, url, category, first_seen_at
+        FROM seen_markets_old
+        WHERE source IN ('polymarket', 'kalshi')
+    """)
+    conn.execute("DROP TABLE seen_markets_old")
+
+
+def _migrate_first_seen_to_epoch(conn: sqlite3.Connection):
+    """Schema v2: store ``first_seen_at`` as unix seconds instead of ISO-8601 text."""
+    conn.execute("ALTER TABLE seen_markets RENAME TO seen_markets_old")
+    conn.execute("""
+        CREATE TABLE seen_markets (
+            id TEXT NOT NULL,
+            source INTEGER NOT NULL,
+            title TEXT,
+            url TEXT,
+            category TEXT,
+            first_seen_at INTEGER NOT NULL,
+            PRIMARY KEY (id, source)
+        )
+    """)
+    # Timestamps were written by datetime.utcnow(), so they parse as UTC
+    conn.execute("""
+        INSERT INTO seen_markets (id, source, title, url, category, first_seen_at)
+        SELECT id, source, title, url, category,
+               COALESCE(CAST(strftime('%s', first_seen_at) AS INTEGER),
+                        CAST(strftime('%s', 'now') AS INTEGER))
+        FROM seen_markets_old
+    """)
+    conn.execute("DROP TABLE seen_markets_old")
+
+
+def _migrate_to_without_rowid(conn: sqlite3.Connection):
+    """Schema v3: store ``seen_markets`` clustered on its primary key (WITHOUT ROWID)."""
+    conn.execute("ALTER TABLE seen_markets RENAME TO seen_markets_old")
+    conn.execute("""
+        CREATE TABLE seen_markets (
+            id TEXT NOT NULL,
+            source INTEGER NOT NULL,
+            title TEXT,
+            url TEXT,
+            category TEXT,
+            first_seen_at INTEGER NOT NULL,
+            PRIMARY KEY (id, source)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT INTO seen_markets (id, source, title, url, category, first_seen_at)
+        SELECT id, source, title, url, category, first_seen_at
+        FROM seen_markets_old
+    """)
+    conn.execute("DROP TABLE seen_markets_old")
+
+
+def _seed_sources(conn: sqlite3.Connection):
+    """Make sure every MarketSource has its row in the ``sources`` lookup table."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO sources (id, name) VALUES (?, ?)",
+        [(source.value, source.name.lower()) for source in MarketSource],
+    )
+
+
+def _migrate_source_to_foreign_key(conn: sqlite3.Connection):
+    """Schema v4: reference ``sources`` from ``seen_markets.source``."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+    _seed_sources(conn)
+    conn.execute("ALTER TABLE seen_markets RENAME TO seen_markets_old")
+    conn.execute("""
+        CREATE TABLE seen_markets (
+            id TEXT NOT NULL,
+            source INTEGER NOT NULL REFERENCES sources (id),
+            title TEXT,
+            url TEXT,
+            category TEXT,
+            first_seen_at INTEGER NOT NULL,
+            PRIMARY KEY (id, source)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT INTO seen_markets (id, source, title, url, category, first_seen_at)
+        SELECT id, source, title, url, category, first_seen_at
+        FROM seen_markets_old
+        WHERE source IN (SELECT id FROM sources)
+    """)
+    conn.execute("DROP TABLE seen_markets_old")
+
+
+# Schema upgrades, in order; a database's PRAGMA user_version counts those applied
+_MIGRATIONS = [
+    _migrate_source_to_integer,
+    _migrate_first_seen_to_epoch,
+    _migrate_to_without_rowid,
+    _migrate_source_to_foreign_key,
+]
+
+
+_SQL_INSERT_SEEN = """
+    INSERT OR IGNORE INTO seen_markets
+    (id, source, title, url, category, first_seen_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
 class MarketStorage:
     """SQLite-based storage for tracking seen market events."""
 
-    def __init__(self, db_path: str = "data/seen_markets.db"):
+    # Rows per transaction in mark_many_seen, to keep the WAL from growing unbounded
+    INSERT_BATCH_SIZE = 5000
+    # Rows deleted per transaction in cleanup_old_entries
+    DELETE_BATCH_SIZE = 5000
+    # Largest candidate batch get_new_events checks with an inline IN list
+    # instead of the probe table
+    MAX_IN_BATCH = 100
+    # Attempts per insert transaction while another process holds the write lock
+    WRITE_ATTEMPTS = 3
+
+    # RAM-backed directory for the working database in fast mode
+    FAST_MODE_DIR = "/dev/shm"
+
+    def __init__(self, db_path: str = "data/seen_markets.db", fast_mode: bool = False):
+        """Open the database at ``db_path``.
+
+        With ``fast_mode`` the working database lives in RAM (/dev/shm, or the
+        temp directory where that is unavailable) and ``db_path`` only holds the
+        snapshots written by snapshot() and close(). Losing the latest changes
+        only means re-posting a few markets after a crash.
+        """
         self.db_path = db_path
+        self.fast_mode = fast_mode
+        self.snapshot_path = db_path
         self._ensure_directory()
+        if fast_mode:
+            self.db_path = self._fast_mode_path()
+            self._restore_snapshot()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
         self._init_db()
+        # Lookups get their own read-only connection so they never wait on writes;
+        # every use of it holds _read_lock so statements from different threads
+        # never land inside another caller's open transaction
+        self._read_lock = threading.Lock()
+        self._reader = self._connect_reader()
+        # MarketSource is an IntEnum, so members bind to SQL and hash in these
+        # keys as their integer value without going through .value
+        self._seen: set[tuple[int, str]] = set()
+        self._load_seen_keys()
+        # Inserts from mark_many_seen_async run here, off the event loop
+        self._write_queue: queue.Queue[tuple[list[tuple], Future] | None] = queue.Queue()
+        self._writer_thread = threading.Thread(
+            target=self._run_writer, name="storage-writer", daemon=True
+        )
+        self._writer_thread.start()
 
     def _ensure_directory(self):
         """Ensure the database directory exists."""
@@ -23,122 +196,401 @@ class MarketStorage:
         if directory:
             os.makedirs(directory, exist_ok=True)
 
-    @contextmanager
-    def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def _fast_mode_path(self) -> str:
+        """Location of the working database in fast mode.
+
+        The name includes a hash of the snapshot's absolute path, so databases
+        whose snapshots share a file name never share a RAM copy.
+        """
+        directory = self.FAST_MODE_DIR
+        if not os.path.isdir(directory):
+            directory = tempfile.gettempdir()
+        snapshot_path = os.path.abspath(self.snapshot_path)
+        digest = hashlib.sha256(snapshot_path.encode()).hexdigest()[:16]
+        stem, ext = os.path.splitext(os.path.basename(snapshot_path))
+        return os.path.join(directory, f"{stem}-{digest}{ext or '.db'}")
+
+    @staticmethod
+    def _last_modified(path: str) -> float:
+        """Latest modification time of a database, counting writes still in its WAL."""
+        mtime = os.path.getmtime(path)
+        if os.path.exists(path + "-wal"):
+            mtime = max(mtime, os.path.getmtime(path + "-wal"))
+        return mtime
+
+    @staticmethod
+    def _remove_database(path: str):
+        """Delete a database file together with its WAL and shared-memory files."""
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _restore_snapshot(self):
+        """Seed the fast-mode database from the last snapshot, e.g. after a reboot."""
+        if not os.path.exists(self.snapshot_path):
+            return
+        if os.path.exists(self.db_path):
+            # A crashed fast-mode run can leave a RAM copy newer than its last snapshot;
+            # anything older (e.g. from before a run without FAST_STORAGE) is stale
+            if self._last_modified(self.db_path) >= self._last_modified(self.snapshot_path):
+                logger.info(f"Using existing RAM copy {self.db_path} of {self.snapshot_path}")
+                return
+            logger.info(f"Discarding stale RAM copy {self.db_path}")
+            self._remove_database(self.db_path)
+        source = sqlite3.connect(self.snapshot_path)
+        target = sqlite3.connect(self.db_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        logger.info(f"Restored database snapshot {self.snapshot_path} to {self.db_path}")
+
+    def snapshot(self):
+        """Copy the fast-mode database to its snapshot path so it survives restarts."""
+        if not self.fast_mode:
+            return
+        target = sqlite3.connect(self.snapshot_path)
         try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+            with self._write_lock:
+                self._writer.backup(target)
         finally:
-            conn.close()
+            target.close()
+        logger.info(f"Saved database snapshot to {self.snapshot_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection used for schema setup and all writes."""
+        # Transactions are managed explicitly in _get_connection and _write
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Wait for other writers instead of failing immediately with SQLITE_BUSY
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Safe with WAL: a crash can lose the last commits, never corrupt the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection for lookups; under WAL it reads alongside the writer."""
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        # Holds a batch of candidate events so get_new_events can probe them in one query;
+        # temp tables live outside the read-only main database
+        conn.execute("CREATE TEMP TABLE probe (id TEXT NOT NULL, source INTEGER NOT NULL)")
+        return conn
+
+    @contextmanager
+    def _get_connection(self):
+        """Context manager running a multi-statement write transaction on the writer connection."""
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _write(self, sql: str, params, many: bool = False) -> sqlite3.Cursor:
+        """Run one statement in its own BEGIN IMMEDIATE transaction on the writer."""
+        conn = self._writer
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                conn.execute("COMMIT")
+            except BaseException:
+                # A failed COMMIT can leave the transaction open; some errors end it already
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            return cursor
+
+    def _insert_rows(self, rows: list[tuple]):
+        """Insert seen-market rows in one write transaction, retrying while the database is locked."""
+        for attempt in range(self.WRITE_ATTEMPTS):
+            try:
+                self._write(_SQL_INSERT_SEEN, rows, many=True)
+                return
+            except sqlite3.OperationalError as e:
+                if "database is locked" not in str(e) or attempt == self.WRITE_ATTEMPTS - 1:
+                    raise
+                delay = 0.1 * (2 ** attempt)
+                logger.warning(f"Database locked, retrying insert in {delay}s")
+                time.sleep(delay)
+
+    def close(self):
+        """Close the database connections, snapshotting first in fast mode.
+
+        In fast mode the RAM copy is then deleted, so only a crash leaves one behind.
+        """
+        self._write_queue.put(None)
+        self._writer_thread.join()
+        self.snapshot()
+        with self._read_lock:
+            self._reader.close()
+        with self._write_lock:
+            self._writer.close()
+        if self.fast_mode:
+            self._remove_database(self.db_path)
 
     def _init_db(self):
-        """Initialize the database schema."""
+        """Initialize the database schema, upgrading databases created by older versions."""
         with self._get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            has_table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'seen_markets'"
+            ).fetchone() is not None
+            if has_table:
+                for new_version, migrate in enumerate(_MIGRATIONS[version:], start=version + 1):
+                    logger.info(f"Migrating database to schema version {new_version}")
+                    migrate(conn)
+
+            # MarketSource values double as the ids, so events bind their source directly
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL
+                )
+            """)
+            _seed_sources(conn)
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS seen_markets (
                     id TEXT NOT NULL,
-                    source TEXT NOT NULL,
+                    source INTEGER NOT NULL REFERENCES sources (id),
                     title TEXT,
                     url TEXT,
                     category TEXT,
-                    first_seen_at TEXT NOT NULL,
+                    first_seen_at INTEGER NOT NULL,
                     PRIMARY KEY (id, source)
-                )
+                ) WITHOUT ROWID
             """)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_first_seen_at
                 ON seen_markets (first_seen_at)
             """)
+            # Lets get_stats count per source from the index alone
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_source
+                ON seen_markets (source)
+            """)
+            conn.execute(f"PRAGMA user_version = {len(_MIGRATIONS)}")
         logger.info(f"Database initialized at {self.db_path}")
 
+    def _load_seen_keys(self):
+        """Load the keys of all seen markets so most lookups can skip the database."""
+        with self._read_lock:
+            cursor = self._reader.execute("SELECT source, id FROM seen_markets")
+            self._seen = {(source, event_id) for source, event_id in cursor}
+        logger.info(f"Loaded {len(self._seen)} seen market keys")
+
     def is_seen(self, event: MarketEvent) -> bool:
         """Check if a market event has already been seen."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT 1 FROM seen_markets WHERE id = ? AND source = ?",
-                (event.id, event.source.value),
-            )
-            return cursor.fetchone() is not None
+        # Every seen key is loaded or added in memory, so no query is needed
+        return (event.source, event.id) in self._seen
 
-    def mark_seen(self, event: MarketEvent):
-        """Mark a market event as seen."""
-        with self._get_connection() as conn:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO seen_markets
-                (id, source, title, url, category, first_seen_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    event.id,
-                    event.source.value,
-                    event.title,
-                    event.url,
-                    event.category,
-                    datetime.utcnow().isoformat(),
-                ),
-            )
+    def mark_seen(self, event: MarketEvent, now: int | None = None):
+        """Mark a market event as seen.
+
+        Callers marking several events can pass a shared ``now`` timestamp
+        in unix seconds.
+        """
+        if now is None:
+            now = int(time.time())
+        self._insert_rows(
+            [(event.id, event.source, event.title, event.url, event.category, now)]
+        )
+        self._seen.add((event.source, event.id))
 
     def get_new_events(self, events: list[MarketEvent]) -> list[MarketEvent]:
         """Filter a list of events to only include new (unseen) ones."""
-        new_events = []
-        for event in events:
-            if not self.is_seen(event):
-                new_events.append(event)
-        return new_events
+        # Every key in memory is known to be seen, so only the rest need a database check
+        seen = self._seen
+        candidates = [e for e in events if (e.source, e.id) not in seen]
 
-    def mark_many_seen(self, events: list[MarketEvent]):
-        """Mark multiple events as seen in a single transaction."""
-        with self._get_connection() as conn:
-            for event in events:
-                conn.execute(
-                    """
-                    INSERT OR IGNORE INTO seen_markets
-                    (id, source, title, url, category, first_seen_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+        if not candidates:
+            return []
+
+        if len(candidates) <= self.MAX_IN_BATCH:
+            placeholders = ",".join(["(?,?)"] * len(candidates))
+            params = [x for e in candidates for x in (e.id, e.source)]
+            # Selecting from the VALUES list (rather than IN (VALUES ...) directly)
+            # lets SQLite seek the primary key instead of scanning the table
+            with self._read_lock:
+                cursor = self._reader.execute(
+                    f"""
+                    SELECT id, source FROM seen_markets WHERE (id, source) IN (
+                        SELECT column1, column2 FROM (VALUES {placeholders})
+                    )
                     """,
-                    (
-                        event.id,
-                        event.source.value,
-                        event.title,
-                        event.url,
-                        event.category,
-                        datetime.utcnow().isoformat(),
-                    ),
+                    params,
                 )
+                found = {(event_id, source) for event_id, source in cursor}
+            return [e for e in candidates if (e.id, e.source) not in found]
 
-    def get_stats(self) -> dict:
-        """Get statistics about seen markets."""
-        with self._get_connection() as conn:
-            stats = {}
+        conn = self._reader
+        with self._read_lock:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO probe (rowid, id, source) VALUES (?, ?, ?)",
+                    [(i, e.id, e.source) for i, e in enumerate(candidates)],
+                )
+                cursor = conn.execute("""
+                    SELECT p.rowid FROM probe p
+                    LEFT JOIN seen_markets s ON s.id = p.id AND s.source = p.source
+                    WHERE s.id IS NULL
+                    ORDER BY p.rowid
+                """)
+                new_events = [candidates[row[0]] for row in cursor]
+            finally:
+                # Rolling back empties the probe table for the next call
+                conn.execute("ROLLBACK")
+        return new_events
+
+    @staticmethod
+    def _event_rows(events: list[MarketEvent]) -> list[tuple]:
+        """Build seen_markets rows for events, sharing one timestamp."""
+        now = int(time.time())
+        return [
+            (event.id, event.source, event.title, event.url, event.category, now)
+            for event in events
+        ]
+
+    def _store_rows(self, rows: list[tuple]):
+        """Insert rows, committing every INSERT_BATCH_SIZE rows."""
+        for start in range(0, len(rows), self.INSERT_BATCH_SIZE):
+            chunk = rows[start:start + self.INSERT_BATCH_SIZE]
+            self._insert_rows(chunk)
+            # Track each committed chunk so is_seen never misses a stored key
+            self._seen.update((source, event_id) for event_id, source, *_ in chunk)
+
+    def mark_many_seen(self, events: list[MarketEvent]):
+        """Mark multiple events as seen, committing every INSERT_BATCH_SIZE rows."""
+        self._store_rows(self._event_rows(events))
+
+    async def mark_many_seen_async(self, events: list[MarketEvent]):
+        """Mark multiple events as seen on the writer thread, without blocking the event loop."""
+        if not events:
+            return
+        if not self._writer_thread.is_alive():
+            # Nothing would ever resolve a queued write; store it inline instead
+            logger.warning("Storage writer thread is not running, writing on the caller's thread")
+            self.mark_many_seen(events)
+            return
+        future: Future = Future()
+        self._write_queue.put((self._event_rows(events), future))
+        await asyncio.wrap_future(future)
+
+    def _run_writer(self):
+        """Writer thread: store queued rows, one transaction per drain of the queue."""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                return
+
+            # Merge everything queued meanwhile into the same transaction
+            batch = [item]
+            stop = False
+            while True:
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._store_rows([row for rows, _ in batch for row in rows])
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                if not isinstance(e, Exception):
+                    # The thread is going down; fail anything still queued too
+                    self._fail_queued(e)
+                    raise
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+            if stop:
+                return
 
-            # Total count
-            cursor = conn.execute("SELECT COUNT(*) FROM seen_markets")
-            stats["total"] = cursor.fetchone()[0]
+    def _fail_queued(self, exc: BaseException):
+        """Resolve every write still waiting in the queue with ``exc``."""
+        while True:
+            try:
+                item = self._write_queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(exc)
 
-            # Count by source
-            cursor = conn.execute(
+    def get_stats(self) -> dict:
+        """Get statistics about seen markets."""
+        with self._read_lock:
+            cursor = self._reader.execute(
                 "SELECT source, COUNT(*) FROM seen_markets GROUP BY source"
             )
-            stats["by_source"] = {row["source"]: row[1] for row in cursor.fetchall()}
+            by_source = {
+                MarketSource(row["source"]).name.lower(): row[1] for row in cursor.fetchall()
+            }
 
-            return stats
+        return {"total": sum(by_source.values()), "by_source": by_source}
 
     def cleanup_old_entries(self, days: int = 90):
         """Remove entries older than the specified number of days."""
-        from datetime import timedelta
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "DELETE FROM seen_markets WHERE first_seen_at < ?", (cutoff,)
+        cutoff = int(time.time()) - days * 86400
+        deleted = 0
+        # Delete in batches so no single transaction bloats the WAL
+        while True:
+            cursor = self._write(
+                """
+                DELETE FROM seen_markets WHERE (id, source) IN (
+                    SELECT id, source FROM seen_markets WHERE first_seen_at < ? LIMIT ?
+                )
+                """,
+                (cutoff, self.DELETE_BATCH_SIZE),
             )
-            deleted = cursor.rowcount
-            if deleted > 0:
-                logger.info(f"Cleaned up {deleted} old market entries")
+            if cursor.rowcount <= 0:
+                break
+            deleted += cursor.rowcount
+            with self._write_lock:
+                self._writer.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+        if deleted > 0:
+            logger.info(f"Cleaned up {deleted} old market entries")
+            with self._write_lock:
+                # Large deletes skew the index statistics; refresh them so the
+                # planner keeps range-scanning idx_first_seen_at
+                if deleted >= self.DELETE_BATCH_SIZE:
+                    self._writer.execute("ANALYZE seen_markets")
+                self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._load_seen_keys()
+
+        self.maybe_optimize()
+
+    def maybe_optimize(self):
+        """Let SQLite refresh query planner statistics it considers stale."""
+        with self._write_lock:
+            self._writer.execute("PRAGMA optimize")